@@ -1,10 +1,10 @@
 """module button_handler"""
 
-import time
 import logging
 import os
 from RPi import GPIO
-from config import BUTTON_PIN
+from config import BUTTON_PIN, BOUNCE_TIME_MS
+from clock import SYSTEM_CLOCK
 
 
 def reboot_system(logger) -> bool:
@@ -67,7 +67,7 @@ def is_system_alive(logger) -> bool:
         return False
 
 
-def button_callback(logger, channel) -> bool:
+def button_callback(logger, channel, clock=SYSTEM_CLOCK) -> bool:
     """
     Callback function for the button press event.
 
@@ -77,6 +77,7 @@ def button_callback(logger, channel) -> bool:
     Args:
         logger (Logger): The logger object to log messages.
         channel (int): The GPIO pin number that triggered the callback.
+        clock (SystemClock | VirtualClock): The clock used for waiting.
 
     Returns:
         bool: True if reboot was initiated (or attempted), False if an error occurred.
@@ -90,7 +91,7 @@ def button_callback(logger, channel) -> bool:
 
     logger.error("Maybe a password is required for sudo.")
     logger.info("Waiting for a second and trying to run /bin/true.")
-    time.sleep(1)
+    clock.sleep(1)
 
     if is_system_alive(logger):
         logger.error(
@@ -103,7 +104,7 @@ def button_callback(logger, channel) -> bool:
     return False
 
 
-def monitor_button(logger, pin: int) -> None:
+def monitor_button(logger, pin: int, clock=SYSTEM_CLOCK) -> None:
     """
     Monitors the button press and sets up GPIO configurations.
 
@@ -114,13 +115,14 @@ def monitor_button(logger, pin: int) -> None:
     Args:
         logger (Logger): The logger object to log messages.
         pin (int): The GPIO pin number to monitor.
+        clock (SystemClock | VirtualClock): The clock used for waiting.
 
     Raises:
         GPIO.InvalidChannelException: Raised when an invalid GPIO channel is specified.
         RuntimeError: Raised when there is a runtime issue adding edge detection.
         ValueError: Raised when an invalid GPIO mode or setup parameter is provided.
     """
-    bouncetime = 500
+    bouncetime = BOUNCE_TIME_MS
     event_added = False
     try:
         logger.debug("Set GPIO mode.")
@@ -130,15 +132,15 @@ def monitor_button(logger, pin: int) -> None:
             "Configuration of the pin as an input pin with pull-up resistor."
         )
         GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        time.sleep(0.1)
+        clock.sleep(0.1)
         logger.debug("GPIO setup done.")
         logger.debug("Add event monitoring.")
         logger.info("GPIO Version is '%s', pin is '%i'", GPIO.VERSION, pin)
-        time.sleep(0.5)  # Add a short delay here
+        clock.sleep(0.5)  # Add a short delay here
         GPIO.add_event_detect(
             pin,
             GPIO.FALLING,
-            callback=lambda channel: button_callback(logger, channel),
+            callback=lambda channel: button_callback(logger, channel, clock),
             bouncetime=bouncetime
         )
         event_added = True
@@ -146,7 +148,7 @@ def monitor_button(logger, pin: int) -> None:
         logger.info("Button monitoring started. Waiting for events...")
         # Keep the script running to detect button presses.
         while True:
-            time.sleep(1)
+            clock.sleep(1)
 
     except ValueError as err:
         logger.error("Invalid GPIO configuration: %s", err)
@@ -0,0 +1,126 @@
+"""module clock"""
+
+import heapq
+import itertools
+import time
+
+
+class SystemClock:
+    """
+    Clock backed by the real monotonic time of the system.
+
+    Every time-dependent part of the application (sleeps, debounce windows,
+    restart delays) takes a clock object instead of calling the time module
+    directly, so that it can be replaced by a VirtualClock in tests.
+    """
+
+    def monotonic(self) -> float:
+        """
+        Returns the current monotonic time.
+
+        Returns:
+            float: The current time in seconds.
+        """
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Blocks the calling thread for the given number of seconds.
+
+        Args:
+            seconds (float): The number of seconds to sleep.
+        """
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Deterministic clock whose time only advances when sleep or advance is called.
+
+    Sleeping returns immediately after moving the virtual time forward, so hours
+    of operation can be simulated in milliseconds. Callbacks scheduled with
+    call_at or call_later are run in time order while the time advances past
+    them, which allows tests to inject events such as button presses or a
+    KeyboardInterrupt into otherwise endless loops.
+    """
+
+    def __init__(self, start: float = 0.0):
+        """
+        Args:
+            start (float): The initial virtual time in seconds.
+        """
+        self._now = start
+        self._scheduled = []
+        self._sequence = itertools.count()
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        """
+        Returns the current virtual time.
+
+        Returns:
+            float: The current virtual time in seconds.
+        """
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Records the sleep and advances the virtual time without blocking.
+
+        Args:
+            seconds (float): The number of seconds to sleep.
+
+        Raises:
+            ValueError: Raised when seconds is negative.
+        """
+        if seconds < 0:
+            raise ValueError(f"Cannot sleep for a negative time: {seconds}")
+        self.sleeps.append(seconds)
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """
+        Advances the virtual time, running every scheduled callback that falls due.
+
+        Each callback is run with the virtual time set to its due time. A callback
+        may sleep itself; if that moves the time past the target, the time is not
+        set back. Exceptions raised by a callback propagate to the caller of
+        advance (or sleep).
+
+        Args:
+            seconds (float): The number of seconds to advance.
+
+        Raises:
+            ValueError: Raised when seconds is negative.
+        """
+        if seconds < 0:
+            raise ValueError(f"Cannot advance the clock by a negative time: {seconds}")
+        target = self._now + seconds
+        while self._scheduled and self._scheduled[0][0] <= target:
+            when, _, callback = heapq.heappop(self._scheduled)
+            self._now = max(self._now, when)
+            callback()
+        self._now = max(self._now, target)
+
+    def call_at(self, when: float, callback) -> None:
+        """
+        Schedules a callback to run once the virtual time reaches the given time.
+
+        Args:
+            when (float): The virtual time in seconds at which to run the callback.
+            callback (callable): A function without arguments.
+        """
+        heapq.heappush(self._scheduled, (when, next(self._sequence), callback))
+
+    def call_later(self, delay: float, callback) -> None:
+        """
+        Schedules a callback to run after the given delay of virtual time.
+
+        Args:
+            delay (float): The delay in seconds.
+            callback (callable): A function without arguments.
+        """
+        self.call_at(self._now + delay, callback)
+
+
+SYSTEM_CLOCK = SystemClock()
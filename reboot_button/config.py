@@ -14,6 +14,9 @@ LOG_FILE_NAME = "reboot_button.log"
 # GPIO pin number for the button
 BUTTON_PIN = 21
 
+# Debounce time in milliseconds for the button edge detection
+BOUNCE_TIME_MS = 500
+
 # Exception handling
 SUCCESS_KEY = "success"
 PROCESS_KEY = "process"
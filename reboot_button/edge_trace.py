@@ -0,0 +1,564 @@
+"""module edge_trace"""
+
+import argparse
+import logging
+import threading
+from config import BUTTON_PIN, BOUNCE_TIME_MS
+from clock import SYSTEM_CLOCK
+
+
+TRACE_MAGIC = b"RBET"
+TRACE_VERSION = 2
+DEFAULT_BUFFER_SIZE = 4096
+DEFAULT_MIN_PRESS = 0.05
+DEFAULT_MATCH_WINDOW = 0.05
+DEBOUNCE_LGPIO = "lgpio"
+DEBOUNCE_RPI_GPIO = "rpi-gpio"
+DEBOUNCE_MODES = (DEBOUNCE_LGPIO, DEBOUNCE_RPI_GPIO)
+
+
+def _encode_varint(value: int) -> bytes:
+    """
+    Encodes a non-negative integer as an unsigned LEB128 varint.
+
+    Args:
+        value (int): The integer to encode.
+
+    Returns:
+        bytes: The encoded integer.
+    """
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+class TraceWriter:
+    """
+    Writes raw edges to a compact trace file.
+
+    The file starts with TRACE_MAGIC, the format version and the level of the pin
+    when the capture started. Each record is stored as one varint holding the time
+    since the previous record in microseconds, shifted left by two bits, with an
+    end-of-capture flag in the second lowest bit and the pin level after the edge
+    in the lowest bit. The last record, written by close, marks the end of the
+    capture. Edges are collected in a buffer of at most buffer_size bytes before
+    being written, so memory use stays bounded for captures of any length.
+    """
+
+    def __init__(self, trace_file, initial_level: int, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Args:
+            trace_file (BinaryIO): The file object opened for binary writing.
+            initial_level (int): The pin level when the capture started (0 or 1).
+            buffer_size (int): The maximum number of bytes buffered before writing.
+        """
+        self._file = trace_file
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self._last_us = 0
+        self.edge_count = 0
+        self._file.write(TRACE_MAGIC + bytes([TRACE_VERSION, initial_level & 1]))
+
+    def write(self, timestamp: float, level: int) -> None:
+        """
+        Appends an edge to the trace.
+
+        Args:
+            timestamp (float): The time of the edge in seconds since the capture start.
+            level (int): The pin level after the edge (0 or 1).
+        """
+        self._append(timestamp, level & 1)
+        self.edge_count += 1
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def close(self, timestamp: float) -> None:
+        """
+        Appends the end-of-capture record and writes the buffered records.
+
+        Args:
+            timestamp (float): The end of the capture in seconds since the capture start.
+        """
+        self._append(timestamp, 0b10)
+        self.flush()
+
+    def _append(self, timestamp: float, flags: int) -> None:
+        """Appends one record with the given flag bits to the buffer."""
+        timestamp_us = max(int(round(timestamp * 1_000_000)), self._last_us)
+        self._buffer += _encode_varint(((timestamp_us - self._last_us) << 2) | flags)
+        self._last_us = timestamp_us
+
+    def flush(self) -> None:
+        """
+        Writes the buffered edges to the trace file.
+        """
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+
+def read_trace(trace_path: str, chunk_size: int = DEFAULT_BUFFER_SIZE):
+    """
+    Streams the edges of a trace file without loading the whole file.
+
+    Args:
+        trace_path (str): The path of the trace file.
+        chunk_size (int): The number of bytes read at once.
+
+    Yields:
+        tuple: The initial level as (0.0, level), then one (timestamp, level)
+            tuple per edge with the timestamp in seconds and finally
+            (timestamp, None) for the end of the capture, if it was recorded.
+
+    Raises:
+        ValueError: Raised when the file is not a trace file or is truncated.
+    """
+    with open(trace_path, "rb") as trace_file:
+        header = trace_file.read(len(TRACE_MAGIC) + 2)
+        if len(header) != len(TRACE_MAGIC) + 2 or header[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+            raise ValueError(f"Not an edge trace file: '{trace_path}'")
+        if header[len(TRACE_MAGIC)] != TRACE_VERSION:
+            raise ValueError(
+                f"Unsupported edge trace version {header[len(TRACE_MAGIC)]} in '{trace_path}'"
+            )
+        yield 0.0, header[-1] & 1
+        timestamp_us = 0
+        value = 0
+        shift = 0
+        while True:
+            chunk = trace_file.read(chunk_size)
+            if not chunk:
+                break
+            for byte in chunk:
+                value |= (byte & 0x7F) << shift
+                if byte & 0x80:
+                    shift += 7
+                    continue
+                timestamp_us += value >> 2
+                yield timestamp_us / 1_000_000, None if value & 0b10 else value & 1
+                value = 0
+                shift = 0
+        if shift:
+            raise ValueError(f"Truncated edge trace file: '{trace_path}'")
+
+
+class _EdgeRecorder:
+    """
+    Writes the edges reported by lgpio alerts to a TraceWriter.
+
+    The alert callbacks run in a thread of lgpio, so the writer is guarded by a lock.
+    """
+
+    def __init__(self, writer: TraceWriter, start_ns: int):
+        """
+        Args:
+            writer (TraceWriter): The writer of the trace file.
+            start_ns (int): The lgpio timestamp of the capture start in nanoseconds.
+        """
+        self._writer = writer
+        self._start_ns = start_ns
+        self._lock = threading.Lock()
+
+    def record(self, _chip, _gpio, level: int, timestamp_ns: int) -> None:
+        """
+        Records an edge, used as lgpio callback.
+
+        Args:
+            level (int): The level after the edge, 2 reports a watchdog timeout.
+            timestamp_ns (int): The lgpio timestamp of the edge in nanoseconds.
+        """
+        if level in (0, 1):
+            with self._lock:
+                self._writer.write((timestamp_ns - self._start_ns) / 1_000_000_000, level)
+
+    def close(self, end_ns: int) -> int:
+        """
+        Ends the trace.
+
+        Args:
+            end_ns (int): The lgpio timestamp of the capture end in nanoseconds.
+
+        Returns:
+            int: The number of recorded edges.
+        """
+        with self._lock:
+            self._writer.close((end_ns - self._start_ns) / 1_000_000_000)
+            return self._writer.edge_count
+
+
+# chip and clock are keyword-only overrides for other Raspberry Pi models and tests.
+def capture_trace(  # pylint: disable=too-many-arguments
+    logger, pin: int, trace_path: str, duration: float, *, chip: int = 0, clock=SYSTEM_CLOCK
+) -> int:
+    """
+    Captures raw edges of a GPIO pin into a trace file.
+
+    The edges are taken directly from lgpio alerts without any debounce. Each
+    record stores the level and the kernel timestamp that lgpio passes to the
+    callback, so the bouncing is recorded as it happened and not as seen by a
+    late read of the pin.
+
+    Args:
+        logger (Logger): The logger object to log messages.
+        pin (int): The GPIO pin number to capture.
+        trace_path (str): The path of the trace file to write.
+        duration (float): The capture duration in seconds.
+        chip (int): The number of the gpiochip device the pin belongs to.
+        clock (SystemClock | VirtualClock): The clock used for waiting.
+
+    Returns:
+        int: The number of captured edges.
+    """
+    # lgpio is only available on a Raspberry Pi, replaying traces must work anywhere.
+    import lgpio  # pylint: disable=import-outside-toplevel
+
+    handle = None
+    alert = None
+    recorder = None
+    edge_count = 0
+    with open(trace_path, "wb") as trace_file:
+        try:
+            handle = lgpio.gpiochip_open(chip)
+            lgpio.gpio_claim_alert(handle, pin, lgpio.BOTH_EDGES, lgpio.SET_PULL_UP)
+            clock.sleep(0.1)
+            recorder = _EdgeRecorder(
+                TraceWriter(trace_file, lgpio.gpio_read(handle, pin)), lgpio.timestamp()
+            )
+            alert = lgpio.callback(handle, pin, lgpio.BOTH_EDGES, recorder.record)
+            logger.info("Capturing edges on GPIO '%s' for %s seconds.", pin, duration)
+            capture_start = clock.monotonic()
+            while clock.monotonic() - capture_start < duration:
+                clock.sleep(min(1, duration - (clock.monotonic() - capture_start)))
+        except KeyboardInterrupt:
+            logger.info("Capture interrupted by user.")
+        except lgpio.error as err:
+            logger.error(
+                "Error Type: '%s', Message: '%s'",
+                type(err).__name__,
+                str(err)
+            )
+        finally:
+            if alert is not None:
+                alert.cancel()
+            if handle is not None:
+                lgpio.gpiochip_close(handle)
+            if recorder is not None:
+                edge_count = recorder.close(lgpio.timestamp())
+    logger.info("Captured %i edges to '%s'.", edge_count, trace_path)
+    return edge_count
+
+
+class _LgpioDebounce:
+    """
+    The debounce of lgpio.gpio_set_debounce_micros: an edge is reported once the
+    level has stayed stable for bouncetime and differs from the last reported level.
+    """
+
+    def __init__(self, bouncetime_ms: int):
+        self.bouncetime_ms = bouncetime_ms
+        self._bouncetime = bouncetime_ms / 1000
+        self._candidate = None
+        self._reported_level = 1
+
+    def reset(self, level: int) -> None:
+        """Starts a new trace with the given initial level."""
+        self._candidate = None
+        self._reported_level = level
+
+    def edge(self, timestamp: float, level: int) -> float:
+        """Processes an edge and returns the time of a reported falling edge or None."""
+        # Every edge restarts the stability timer, even one that repeats the level,
+        # because it means the pin has changed in between.
+        reported = self.finish(timestamp)
+        self._candidate = (timestamp, level)
+        return reported
+
+    def finish(self, now: float) -> float:
+        """Reports the last edge if its level stayed stable for bouncetime until now."""
+        if self._candidate is None:
+            return None
+        edge_time, level = self._candidate
+        self._candidate = None
+        if now - edge_time < self._bouncetime or level == self._reported_level:
+            return None
+        self._reported_level = level
+        return edge_time if level == 0 else None
+
+
+class _RpiGpioDebounce:
+    """
+    The bouncetime of the classic RPi.GPIO library: a falling edge is reported
+    unless it follows the previous report within bouncetime.
+    """
+
+    def __init__(self, bouncetime_ms: int):
+        self.bouncetime_ms = bouncetime_ms
+        self._bouncetime = bouncetime_ms / 1000
+        self._level = 1
+        self._last_report = None
+
+    def reset(self, level: int) -> None:
+        """Starts a new trace with the given initial level."""
+        self._level = level
+        self._last_report = None
+
+    def edge(self, timestamp: float, level: int) -> float:
+        """Processes an edge and returns the time of a reported falling edge or None."""
+        if level == self._level:
+            return None
+        self._level = level
+        if level != 0 or (
+            self._last_report is not None and timestamp - self._last_report <= self._bouncetime
+        ):
+            return None
+        self._last_report = timestamp
+        return timestamp
+
+    def finish(self, _now: float) -> float:
+        """Edges are reported immediately, so nothing is reported at the end."""
+        return None
+
+
+_DEBOUNCERS = {
+    DEBOUNCE_LGPIO: _LgpioDebounce,
+    DEBOUNCE_RPI_GPIO: _RpiGpioDebounce,
+}
+
+
+class PressEvaluator:
+    """
+    Replays edges through the falling edge detection of monitor_button.
+
+    Two debounce rules are modelled. DEBOUNCE_LGPIO is the rule of rpi-lgpio,
+    which this project installs: add_event_detect passes bouncetime to
+    lgpio.gpio_set_debounce_micros, so an edge is only reported once the level
+    has stayed stable for bouncetime and differs from the last reported level.
+    DEBOUNCE_RPI_GPIO is the rule of the classic RPi.GPIO library: a falling
+    edge is reported unless it follows the previous report within bouncetime.
+    Every reported falling edge triggers the button callback.
+
+    Real presses are taken to be the periods in which the pin stays low for at
+    least min_press seconds. A trigger belongs to a press when it lies between
+    match_window seconds before the press and its release. The first trigger of a
+    press is a hit; all other triggers are false triggers, because every trigger
+    reboots the system. Presses without a trigger are missed presses.
+
+    Each trace is evaluated by calling reset with its initial level, feed for
+    every edge and finish with the end time of the trace.
+    """
+
+    def __init__(
+        self,
+        bouncetime_ms: int,
+        min_press: float = DEFAULT_MIN_PRESS,
+        match_window: float = DEFAULT_MATCH_WINDOW,
+        debounce: str = DEBOUNCE_LGPIO
+    ):
+        """
+        Args:
+            bouncetime_ms (int): The bouncetime in milliseconds to evaluate.
+            min_press (float): The minimum low time in seconds of a real press.
+            match_window (float): The time in seconds a trigger may precede a press.
+            debounce (str): The debounce rule, one of DEBOUNCE_MODES.
+
+        Raises:
+            ValueError: Raised when debounce is not one of DEBOUNCE_MODES.
+        """
+        if debounce not in _DEBOUNCERS:
+            raise ValueError(f"Unknown debounce rule: '{debounce}'")
+        self._debounce = debounce
+        self._debouncer = _DEBOUNCERS[debounce](bouncetime_ms)
+        self._press_limits = (min_press, match_window)
+        self._level = 1
+        self._low_since = None
+        self._pending = []
+        self._counts = {"presses": 0, "triggers": 0, "false_triggers": 0, "missed_presses": 0}
+
+    def reset(self, level: int) -> None:
+        """
+        Starts a new trace with the given level.
+
+        Args:
+            level (int): The initial pin level of the trace.
+        """
+        self._debouncer.reset(level)
+        self._pending = []
+        self._level = level
+        self._low_since = 0.0 if level == 0 else None
+
+    def finish(self, end_time: float) -> None:
+        """
+        Finishes the current trace.
+
+        A press that is still held at the end of the trace counts if the pin has
+        been low for at least min_press seconds up to end_time.
+
+        Args:
+            end_time (float): The end of the trace in seconds.
+        """
+        self._trigger(self._debouncer.finish(end_time))
+        if self._low_since is not None:
+            self._finish_low(end_time)
+        self._counts["false_triggers"] += len(self._pending)
+        self._pending = []
+
+    def feed(self, timestamp: float, level: int) -> None:
+        """
+        Processes one edge.
+
+        Args:
+            timestamp (float): The time of the edge in seconds.
+            level (int): The pin level after the edge (0 or 1).
+        """
+        self._trigger(self._debouncer.edge(timestamp, level))
+        if level == self._level:
+            return
+        self._level = level
+        if level == 0:
+            self._low_since = timestamp
+        else:
+            self._finish_low(timestamp)
+
+    def _trigger(self, timestamp: float) -> None:
+        """Records a reported falling edge, which triggers the button callback."""
+        if timestamp is not None:
+            self._counts["triggers"] += 1
+            self._pending.append(timestamp)
+
+    def _finish_low(self, release: float) -> None:
+        """Classifies the pending triggers when a low period ends at release."""
+        min_press, match_window = self._press_limits
+        low_since = self._low_since
+        self._low_since = None
+        if release - low_since >= min_press:
+            self._counts["presses"] += 1
+            earliest = low_since - match_window
+            matched = [trigger for trigger in self._pending if trigger >= earliest]
+            self._counts["false_triggers"] += len(self._pending) - len(matched)
+            if matched:
+                self._counts["false_triggers"] += len(matched) - 1
+            else:
+                self._counts["missed_presses"] += 1
+            self._pending = []
+        else:
+            earliest = release - match_window
+            kept = [trigger for trigger in self._pending if trigger >= earliest]
+            self._counts["false_triggers"] += len(self._pending) - len(kept)
+            self._pending = kept
+
+    def result(self) -> dict:
+        """
+        Returns the evaluation result. finish must have been called after the last trace.
+
+        Returns:
+            dict: The counts and the false trigger and missed press rates.
+        """
+        counts = self._counts
+        return {
+            "debounce": self._debounce,
+            "bouncetime_ms": self._debouncer.bouncetime_ms,
+            **counts,
+            "false_trigger_rate":
+                counts["false_triggers"] / counts["triggers"] if counts["triggers"] else 0.0,
+            "missed_press_rate":
+                counts["missed_presses"] / counts["presses"] if counts["presses"] else 0.0,
+        }
+
+
+def sweep_bouncetimes(
+    trace_paths,
+    bouncetimes_ms,
+    min_press: float = DEFAULT_MIN_PRESS,
+    match_window: float = DEFAULT_MATCH_WINDOW,
+    debounce: str = DEBOUNCE_LGPIO
+) -> list:
+    """
+    Replays trace files for several bouncetimes at once.
+
+    Each trace is streamed a single time and every edge is fed to one
+    PressEvaluator per bouncetime, so large trace corpora can be swept quickly.
+
+    Args:
+        trace_paths (list): The paths of the trace files.
+        bouncetimes_ms (list): The bouncetimes in milliseconds to evaluate.
+        min_press (float): The minimum low time in seconds of a real press.
+        match_window (float): The time in seconds a trigger may precede a press.
+        debounce (str): The debounce rule, one of DEBOUNCE_MODES.
+
+    Returns:
+        list: One result dictionary per bouncetime, see PressEvaluator.result.
+    """
+    evaluators = [
+        PressEvaluator(bouncetime_ms, min_press, match_window, debounce)
+        for bouncetime_ms in bouncetimes_ms
+    ]
+    for trace_path in trace_paths:
+        edges = read_trace(trace_path)
+        _, initial_level = next(edges)
+        for evaluator in evaluators:
+            evaluator.reset(initial_level)
+        end_time = 0.0
+        for end_time, level in edges:
+            if level is None:
+                break
+            for evaluator in evaluators:
+                evaluator.feed(end_time, level)
+        for evaluator in evaluators:
+            evaluator.finish(end_time)
+    return [evaluator.result() for evaluator in evaluators]
+
+
+def main(argv=None) -> None:
+    """
+    Command line entry point to capture traces or sweep bouncetimes over traces.
+
+    Args:
+        argv (list): The command line arguments, sys.argv is used if None.
+    """
+    parser = argparse.ArgumentParser(description="Capture and replay button edge traces.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    capture_parser = subparsers.add_parser("capture", help="capture raw edges of a pin")
+    capture_parser.add_argument("trace_path")
+    capture_parser.add_argument("--pin", type=int, default=BUTTON_PIN)
+    capture_parser.add_argument("--duration", type=float, default=60.0)
+    capture_parser.add_argument("--chip", type=int, default=0, help="gpiochip number (default 0)")
+    sweep_parser = subparsers.add_parser("sweep", help="replay traces for several bouncetimes")
+    sweep_parser.add_argument("trace_paths", nargs="+")
+    sweep_parser.add_argument(
+        "--bouncetime", type=int, action="append", dest="bouncetimes",
+        help=f"bouncetime in milliseconds, may be repeated (default {BOUNCE_TIME_MS})"
+    )
+    sweep_parser.add_argument("--min-press", type=float, default=DEFAULT_MIN_PRESS)
+    sweep_parser.add_argument("--match-window", type=float, default=DEFAULT_MATCH_WINDOW)
+    sweep_parser.add_argument(
+        "--debounce", choices=DEBOUNCE_MODES, default=DEBOUNCE_LGPIO,
+        help=f"debounce rule to replay (default {DEBOUNCE_LGPIO}, as used by rpi-lgpio)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "capture":
+        logging.basicConfig(level=logging.INFO)
+        capture_trace(
+            logging.getLogger("reboot_button"), args.pin, args.trace_path, args.duration,
+            chip=args.chip
+        )
+        return
+    results = sweep_bouncetimes(
+        args.trace_paths, args.bouncetimes or [BOUNCE_TIME_MS], args.min_press,
+        args.match_window, args.debounce
+    )
+    print(f"debounce rule: {args.debounce}")
+    print("bouncetime_ms presses triggers false_triggers missed_presses false_rate missed_rate")
+    for result in results:
+        print(
+            f"{result['bouncetime_ms']:13d} {result['presses']:7d} {result['triggers']:8d} "
+            f"{result['false_triggers']:14d} {result['missed_presses']:14d} "
+            f"{result['false_trigger_rate']:10.4f} {result['missed_press_rate']:11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
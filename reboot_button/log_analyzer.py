@@ -0,0 +1,360 @@
+"""module log_analyzer"""
+
+import argparse
+import collections
+import glob
+import gzip
+import mmap
+import os
+import re
+from datetime import datetime
+from config import LOG_DIR_NAME_ROOT, LOG_FILE_NAME
+
+
+# Matches the format of logger_config.setup_file_logger and classifies the message
+# in the same pass. Messages that are not of interest match the empty alternative.
+LINE_PATTERN = re.compile(
+    rb"(?P<timestamp>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) - (?P<level>[A-Z]+) - "
+    rb"(?:(?P<press>Button pressed on GPIO )"
+    rb"|(?P<reboot_attempt>Rebooting system\.\.\.)"
+    rb"|(?P<sudo_failure>Maybe a password is required for sudo\.)"
+    rb"|(?P<process_start>File logger for log file )"
+    rb"|(?P<setup_start>GPIO Version is )"
+    rb"|(?P<setup_done>Button monitoring started\.)"
+    rb"|)"
+)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+DEFAULT_STORM_RESTARTS = 5
+DEFAULT_STORM_WINDOW = 60.0
+ROTATION_SUFFIX_PATTERN = re.compile(r"\.(\d+)(?:\.gz)?")
+# The number of bytes before the bisection result that are checked for lines at or
+# after since, which the bisection misses when the clock jumped backwards.
+SEEK_BACKTRACK_BYTES = 1 << 20
+COUNTED_MESSAGES = {
+    "press": "presses",
+    "reboot_attempt": "reboot_attempts",
+    "sudo_failure": "sudo_failures",
+    "process_start": "process_starts",
+}
+
+
+def find_log_segments(log_file_path) -> list:
+    """
+    Finds the current log file and its rotated segments.
+
+    Rotated segments are files next to the log file whose name starts with the
+    name of the log file, e.g. 'reboot_button.log.1' or 'reboot_button.log.2.gz'.
+    They are ordered by their rotation suffix, a higher number being older, or by
+    name for other suffixes such as dates. The modification time only breaks ties,
+    because copying the logs off a unit usually resets it.
+
+    Args:
+        log_file_path (str): The path of the current log file.
+
+    Returns:
+        list: The paths of all segments, oldest first, the current log file last.
+    """
+    rotated = [
+        path for path in glob.glob(glob.escape(log_file_path) + "[.-]*")
+        if os.path.isfile(path)
+    ]
+    rotated.sort(key=lambda path: _segment_sort_key(log_file_path, path))
+    if os.path.isfile(log_file_path):
+        rotated.append(log_file_path)
+    return rotated
+
+
+def _segment_sort_key(log_file_path, segment_path) -> tuple:
+    """Returns the key that sorts rotated segments oldest first."""
+    suffix = segment_path[len(log_file_path):]
+    match = ROTATION_SUFFIX_PATTERN.fullmatch(suffix)
+    if match:
+        return (1, -int(match.group(1)), os.path.getmtime(segment_path))
+    return (0, suffix.removesuffix(".gz"), os.path.getmtime(segment_path))
+
+
+def _first_timestamp_from(data, pos: int, since: bytes) -> bytes:
+    """
+    Returns the timestamp of the first parsable line starting at or after pos.
+
+    Returns since + b"~" if there is none, which sorts after every timestamp.
+    """
+    if pos > 0:
+        pos = data.find(b"\n", pos - 1) + 1
+        if pos == 0:
+            return since + b"~"
+    while pos < len(data):
+        match = LINE_PATTERN.match(data, pos)
+        if match:
+            return match.group("timestamp")
+        pos = data.find(b"\n", pos) + 1
+        if pos == 0:
+            break
+    return since + b"~"
+
+
+def seek_since(data, since: bytes) -> int:
+    """
+    Finds the offset of the first line logged at or after since by bisection.
+
+    Timestamps in the log format sort like strings, so they are compared without
+    parsing. The bisection assumes chronological order, which does not hold when
+    the clock of a Raspberry Pi without RTC jumps, e.g. when NTP syncs after the
+    boot. Therefore the SEEK_BACKTRACK_BYTES before the bisection result are
+    scanned as well and the offset moves back to the first line at or after since
+    found there. Lines before since that follow the offset must be skipped by the
+    caller. Lines more than SEEK_BACKTRACK_BYTES before the result are not found.
+
+    Args:
+        data (bytes | mmap.mmap): The content of a log file.
+        since (bytes): The timestamp in log format, e.g. b"2025-03-18 12:00:00,000".
+
+    Returns:
+        int: The offset of the first line at or after since, len(data) if there is none.
+    """
+    low, high = 0, len(data)
+    while low < high:
+        mid = (low + high) // 2
+        if _first_timestamp_from(data, mid, since) < since:
+            low = mid + 1
+        else:
+            high = mid
+    if low > 0:
+        low = data.find(b"\n", low - 1) + 1 or len(data)
+    pos = max(0, low - SEEK_BACKTRACK_BYTES)
+    if pos > 0:
+        pos = data.find(b"\n", pos - 1) + 1
+    while pos < low:
+        match = LINE_PATTERN.match(data, pos)
+        if match and match.group("timestamp") >= since:
+            return pos
+        pos = data.find(b"\n", pos) + 1
+        if pos == 0:
+            break
+    return low
+
+
+def iter_segment_lines(segment_path, since: bytes = None):
+    """
+    Streams the lines of a log segment without loading it into memory.
+
+    Uncompressed segments are memory-mapped and, if since is given, the reading
+    starts at the offset found by seek_since. Gzip compressed segments cannot be
+    seeked and are decompressed as a stream. In both cases the caller must skip
+    lines before since.
+
+    Args:
+        segment_path (str): The path of the segment.
+        since (bytes): The timestamp in log format of the first line of interest.
+
+    Yields:
+        bytes: The lines of the segment.
+    """
+    if segment_path.endswith(".gz"):
+        with gzip.open(segment_path, "rb") as segment_file:
+            yield from segment_file
+        return
+    with open(segment_path, "rb") as segment_file:
+        if os.fstat(segment_file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if since is not None:
+                data.seek(seek_since(data, since))
+            yield from iter(data.readline, b"")
+
+
+def _parse_timestamp(raw: bytes) -> datetime:
+    """Converts a timestamp in log format to a datetime."""
+    return datetime.strptime(raw.decode("ascii"), TIMESTAMP_FORMAT)
+
+
+def _since_to_raw(since: datetime) -> bytes:
+    """
+    Converts since to a timestamp in log format. A timezone-aware time is
+    converted to the local time the logger writes.
+    """
+    if since.tzinfo is not None:
+        since = since.astimezone().replace(tzinfo=None)
+    return since.strftime(TIMESTAMP_FORMAT)[:-3].encode("ascii")
+
+
+class _RestartStormTracker:
+    """
+    Collects restart storms, periods in which at least storm_restarts setups
+    lie within storm_window seconds.
+    """
+
+    def __init__(self, storm_restarts: int, storm_window: float):
+        self._storm_restarts = storm_restarts
+        self._storm_window = storm_window
+        self._recent_setups = collections.deque()
+        self._storm = {}
+        self._storms = []
+
+    def add(self, setup_start: datetime) -> None:
+        """Adds the start of a setup, which must not be older than the previous one."""
+        self._recent_setups.append(setup_start)
+        while (setup_start - self._recent_setups[0]).total_seconds() > self._storm_window:
+            self._recent_setups.popleft()
+        if len(self._recent_setups) < self._storm_restarts:
+            self._storm = {}
+        elif self._storm:
+            self._storm["end"] = setup_start
+            self._storm["restarts"] += 1
+        else:
+            self._storm = {
+                "start": self._recent_setups[0],
+                "end": setup_start,
+                "restarts": len(self._recent_setups),
+            }
+            self._storms.append(self._storm)
+
+    def result(self) -> list:
+        """Returns the restart storms as dictionaries with start, end and restarts."""
+        return self._storms
+
+
+class _SetupDurations:
+    """Collects the minimum, maximum and mean duration of the GPIO setups."""
+
+    def __init__(self):
+        self._setup_start = None
+        self._total = 0.0
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+
+    def start(self, timestamp: datetime) -> None:
+        """Records the start of a setup."""
+        self._setup_start = timestamp
+
+    def done(self, timestamp: datetime) -> None:
+        """Records the end of a setup, ignored if no setup was started."""
+        if self._setup_start is None:
+            return
+        duration = (timestamp - self._setup_start).total_seconds()
+        self._setup_start = None
+        self.count += 1
+        self._total += duration
+        self.minimum = duration if self.minimum is None else min(self.minimum, duration)
+        self.maximum = duration if self.maximum is None else max(self.maximum, duration)
+
+    @property
+    def mean(self) -> float:
+        """The mean duration in seconds, None if no setup was completed."""
+        return self._total / self.count if self.count else None
+
+
+def analyze_log(
+    log_file_path,
+    since: datetime = None,
+    storm_restarts: int = DEFAULT_STORM_RESTARTS,
+    storm_window: float = DEFAULT_STORM_WINDOW
+) -> dict:
+    """
+    Summarizes the log file of the application and its rotated segments.
+
+    All segments are streamed oldest first in a single pass, so memory use does
+    not depend on the size of the log. A restart storm is a period in which the
+    button monitoring was set up at least storm_restarts times within
+    storm_window seconds. The setup duration is the time from the start of the
+    GPIO setup to the start of the button monitoring.
+
+    Args:
+        log_file_path (str): The path of the current log file.
+        since (datetime): Only lines logged at or after this time are analyzed. A
+            timezone-aware time is converted to the local time of the log.
+        storm_restarts (int): The number of setups that makes a restart storm.
+        storm_window (float): The window in seconds for restart storms.
+
+    Returns:
+        dict: The summary of the log.
+    """
+    summary = {
+        "segments": 0,
+        "lines": 0,
+        "unparsed_lines": 0,
+        "errors": 0,
+        "presses": 0,
+        "reboot_attempts": 0,
+        "sudo_failures": 0,
+        "process_starts": 0,
+    }
+    since_raw = _since_to_raw(since) if since is not None else None
+    storms = _RestartStormTracker(storm_restarts, storm_window)
+    setups = _SetupDurations()
+
+    for segment_path in find_log_segments(log_file_path):
+        segment_lines = 0
+        for line in iter_segment_lines(segment_path, since_raw):
+            match = LINE_PATTERN.match(line)
+            if not match:
+                # With since, unparsed lines only count after the first line at or after
+                # since, so that compressed and seeked plain segments count alike.
+                if since_raw is None or segment_lines:
+                    summary["unparsed_lines"] += 1
+                continue
+            if since_raw is not None and match.group("timestamp") < since_raw:
+                continue
+            segment_lines += 1
+            if match.group("level") == b"ERROR":
+                summary["errors"] += 1
+            kind = match.lastgroup
+            if kind in COUNTED_MESSAGES:
+                summary[COUNTED_MESSAGES[kind]] += 1
+            elif kind == "setup_start":
+                setup_start = _parse_timestamp(match.group("timestamp"))
+                setups.start(setup_start)
+                storms.add(setup_start)
+            elif kind == "setup_done":
+                setups.done(_parse_timestamp(match.group("timestamp")))
+        summary["lines"] += segment_lines
+        summary["segments"] += 1 if segment_lines else 0
+
+    summary["setups"] = setups.count
+    summary["setup_min"] = setups.minimum
+    summary["setup_max"] = setups.maximum
+    summary["setup_mean"] = setups.mean
+    summary["restart_storms"] = storms.result()
+    return summary
+
+
+def main(argv=None) -> None:
+    """
+    Command line entry point to print the summary of a log file.
+
+    Args:
+        argv (list): The command line arguments, sys.argv is used if None.
+    """
+    parser = argparse.ArgumentParser(description="Summarize the reboot button log files.")
+    parser.add_argument(
+        "log_file_path", nargs="?", default=os.path.join(LOG_DIR_NAME_ROOT, LOG_FILE_NAME)
+    )
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat,
+        help="only analyze lines logged at or after this time, e.g. '2025-03-18 12:00'; "
+             "the search assumes mostly chronological lines, lines logged before a backwards "
+             f"clock jump more than {SEEK_BACKTRACK_BYTES // 1024} KiB earlier may be missed"
+    )
+    parser.add_argument("--storm-restarts", type=int, default=DEFAULT_STORM_RESTARTS)
+    parser.add_argument("--storm-window", type=float, default=DEFAULT_STORM_WINDOW)
+    args = parser.parse_args(argv)
+
+    summary = analyze_log(args.log_file_path, args.since, args.storm_restarts, args.storm_window)
+    for key in (
+        "segments", "lines", "unparsed_lines", "errors", "presses", "reboot_attempts",
+        "sudo_failures", "process_starts", "setups"
+    ):
+        print(f"{key}: {summary[key]}")
+    if summary["setups"]:
+        print(
+            f"setup_duration: min {summary['setup_min']:.3f}s, "
+            f"mean {summary['setup_mean']:.3f}s, max {summary['setup_max']:.3f}s"
+        )
+    print(f"restart_storms: {len(summary['restart_storms'])}")
+    for storm in summary["restart_storms"]:
+        print(f"  {storm['start']} - {storm['end']}: {storm['restarts']} restarts")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 """module main"""
 
 import sys
-import time
 from config import (
     LOG_DIR_NAME_ROOT,
     LOG_DIR_NAME_HOME,
@@ -11,11 +10,15 @@ from config import (
 from log_file import setup_log_file
 from logger_config import setup_file_logger
 from button_handler import monitor_button
+from clock import SYSTEM_CLOCK
 
 
-def main():
+def main(clock=SYSTEM_CLOCK):
     """
     Main entry point for the application.
+
+    Args:
+        clock (SystemClock | VirtualClock): The clock used for all waiting.
     """
     result_setup_log_file = setup_log_file(
         LOG_DIR_NAME_ROOT,
@@ -31,8 +34,8 @@ def main():
     )
     logger.info("Entering button monitoring mode on GPIO pin %s.", BUTTON_PIN)
     while True:
-        monitor_button(logger, BUTTON_PIN)
-        time.sleep(1)
+        monitor_button(logger, BUTTON_PIN, clock)
+        clock.sleep(1)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 import logging
 from unittest.mock import patch, Mock
 import pytest
+from reboot_button.clock import VirtualClock
 
 
 # pylint: disable=import-outside-toplevel
@@ -101,11 +102,10 @@ def test_is_system_alive_os_error(logger):
 
 
 @patch.dict('sys.modules', {'RPi': Mock(), 'RPi.GPIO': Mock()})
-@patch("reboot_button.button_handler.time.sleep")
 @patch("reboot_button.button_handler.is_system_alive")
 @patch("reboot_button.button_handler.reboot_system")
 def test_button_callback_reboot_success(
-    mock_reboot_system, mock_is_system_alive, mock_sleep, logger
+    mock_reboot_system, mock_is_system_alive, logger
 ):
     """Test button_callback with successful reboot_system."""
     # The modules can only be imported now, because RPi and RPi.GPIO are only mocked here.
@@ -113,19 +113,19 @@ def test_button_callback_reboot_success(
     from reboot_button.button_handler import button_callback
 
     mock_reboot_system.return_value = True
-    result = button_callback(logger, 17)
+    clock = VirtualClock()
+    result = button_callback(logger, 17, clock)
     mock_reboot_system.assert_called_once_with(logger)
     mock_is_system_alive.assert_not_called()
-    mock_sleep.assert_not_called()
+    assert not clock.sleeps
     assert result is True, f"Expected button_callback to return True, but got {result}"
 
 
 @patch.dict('sys.modules', {'RPi': Mock(), 'RPi.GPIO': Mock()})
-@patch("reboot_button.button_handler.time.sleep")
 @patch("reboot_button.button_handler.is_system_alive")
 @patch("reboot_button.button_handler.reboot_system")
 def test_button_callback_reboot_failed_system_alive(
-    mock_reboot_system, mock_is_system_alive, mock_sleep, logger
+    mock_reboot_system, mock_is_system_alive, logger
 ):
     """Test button_callback with failed reboot and system alive."""
     # The modules can only be imported now, because RPi and RPi.GPIO are only mocked here.
@@ -134,19 +134,19 @@ def test_button_callback_reboot_failed_system_alive(
 
     mock_reboot_system.return_value = False
     mock_is_system_alive.return_value = True
-    result = button_callback(logger, 17)
+    clock = VirtualClock()
+    result = button_callback(logger, 17, clock)
     mock_reboot_system.assert_called_once_with(logger)
     mock_is_system_alive.assert_called_once_with(logger)
-    mock_sleep.assert_called_once_with(1)
+    assert clock.sleeps == [1]
     assert result is False
 
 
 @patch.dict('sys.modules', {'RPi': Mock(), 'RPi.GPIO': Mock()})
-@patch("reboot_button.button_handler.time.sleep")
 @patch("reboot_button.button_handler.is_system_alive")
 @patch("reboot_button.button_handler.reboot_system")
 def test_button_callback_reboot_failed_system_dead(
-    mock_reboot_system, mock_is_system_alive, mock_sleep, logger
+    mock_reboot_system, mock_is_system_alive, logger
 ):
     """Test button_callback with failed reboot and system dead."""
     # The modules can only be imported now, because RPi and RPi.GPIO are only mocked here.
@@ -155,8 +155,64 @@ def test_button_callback_reboot_failed_system_dead(
 
     mock_reboot_system.return_value = False
     mock_is_system_alive.return_value = False
-    result = button_callback(logger, 17)
+    clock = VirtualClock()
+    result = button_callback(logger, 17, clock)
     mock_reboot_system.assert_called_once_with(logger)
     mock_is_system_alive.assert_called_once_with(logger)
-    mock_sleep.assert_called_once_with(1)
+    assert clock.sleeps == [1]
     assert result is False
+
+
+@patch.dict('sys.modules', {'RPi': Mock(), 'RPi.GPIO': Mock()})
+def test_monitor_button_runs_until_interrupted(logger):
+    """Test monitor_button keeps running for hours of virtual time and cleans up."""
+    # The modules can only be imported now, because RPi and RPi.GPIO are only mocked here.
+    # RPi and RPi.GPIO must be mocked, because they can only be imported on a Raspberry Pi
+    from reboot_button.button_handler import monitor_button, GPIO
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    GPIO.reset_mock()
+    clock = VirtualClock()
+    clock.call_at(6 * 60 * 60, interrupt)
+    monitor_button(logger, 17, clock)
+    assert clock.monotonic() == 6 * 60 * 60
+    GPIO.add_event_detect.assert_called_once()
+    GPIO.remove_event_detect.assert_called_once_with(17)
+    GPIO.cleanup.assert_called_once()
+
+
+@patch.dict('sys.modules', {'RPi': Mock(), 'RPi.GPIO': Mock()})
+@patch("reboot_button.button_handler.is_system_alive")
+@patch("reboot_button.button_handler.reboot_system")
+def test_monitor_button_press_sleeps_inside_monitoring(
+    mock_reboot_system, mock_is_system_alive, logger
+):
+    """Test that a press during monitoring advances the virtual time monotonically."""
+    # The modules can only be imported now, because RPi and RPi.GPIO are only mocked here.
+    # RPi and RPi.GPIO must be mocked, because they can only be imported on a Raspberry Pi
+    from reboot_button.button_handler import monitor_button, GPIO
+
+    mock_reboot_system.return_value = False
+    mock_is_system_alive.return_value = True
+    seen = []
+
+    def press():
+        GPIO.add_event_detect.call_args.kwargs["callback"](17)
+        seen.append(clock.monotonic())
+
+    def interrupt():
+        seen.append(clock.monotonic())
+        raise KeyboardInterrupt
+
+    GPIO.reset_mock()
+    clock = VirtualClock()
+    clock.call_at(10.3, press)
+    clock.call_at(12.0, interrupt)
+    monitor_button(logger, 17, clock)
+    # The press sleeps for a second inside the loop sleep from 9.6 to 10.6, so the loop
+    # resumes at 11.3 and the interrupt falls into the next loop sleep.
+    assert seen == [11.3, 12.0]
+    assert clock.sleeps == [0.1, 0.5] + [1] * 10 + [1] + [1]
+    mock_reboot_system.assert_called_once_with(logger)
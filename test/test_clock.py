@@ -0,0 +1,88 @@
+"""module test_clock"""
+
+import pytest
+from reboot_button.clock import SystemClock, VirtualClock
+
+
+def test_system_clock_is_monotonic():
+    """
+    Test that SystemClock returns non-decreasing times.
+    """
+    clock = SystemClock()
+    first = clock.monotonic()
+    clock.sleep(0)
+    assert clock.monotonic() >= first
+
+
+def test_virtual_clock_sleep_advances_time():
+    """
+    Test that VirtualClock.sleep advances the virtual time and records the sleep.
+    """
+    clock = VirtualClock(start=10.0)
+    clock.sleep(1.5)
+    clock.sleep(0.5)
+    assert clock.monotonic() == 12.0
+    assert clock.sleeps == [1.5, 0.5]
+
+
+def test_virtual_clock_rejects_negative_advance():
+    """
+    Test that VirtualClock.advance raises ValueError for a negative time.
+    """
+    clock = VirtualClock()
+    with pytest.raises(ValueError):
+        clock.advance(-1)
+
+
+def test_virtual_clock_runs_callbacks_in_order_at_due_time():
+    """
+    Test that scheduled callbacks run in time order with the clock set to their due time.
+    """
+    clock = VirtualClock()
+    seen = []
+    clock.call_at(5, lambda: seen.append(("b", clock.monotonic())))
+    clock.call_later(2, lambda: seen.append(("a", clock.monotonic())))
+    clock.call_at(5, lambda: seen.append(("c", clock.monotonic())))
+    clock.advance(4)
+    assert seen == [("a", 2)]
+    clock.advance(10)
+    assert seen == [("a", 2), ("b", 5), ("c", 5)]
+    assert clock.monotonic() == 14
+
+
+def test_virtual_clock_simulates_hours_of_sleeping():
+    """
+    Test that a day of one-second sleeps is simulated without real waiting.
+    """
+    clock = VirtualClock()
+    ticks = []
+    clock.call_at(24 * 60 * 60, lambda: ticks.append(clock.monotonic()))
+    for _ in range(24 * 60 * 60):
+        clock.sleep(1)
+    assert ticks == [24 * 60 * 60]
+    assert clock.monotonic() == 24 * 60 * 60
+
+
+def test_virtual_clock_rejects_negative_sleep():
+    """
+    Test that VirtualClock.sleep raises ValueError for a negative time without recording it.
+    """
+    clock = VirtualClock()
+    with pytest.raises(ValueError):
+        clock.sleep(-1)
+    assert not clock.sleeps
+
+
+def test_virtual_clock_never_goes_backwards_after_nested_sleep():
+    """
+    Test that a callback sleeping past the target of the outer sleep keeps the later time.
+    """
+    clock = VirtualClock()
+    seen = []
+    clock.call_at(0.5, lambda: clock.sleep(1))
+    clock.call_at(1.2, lambda: seen.append(clock.monotonic()))
+    clock.sleep(1)
+    assert clock.monotonic() == 1.5
+    assert seen == [1.2]
+    clock.sleep(1)
+    assert clock.monotonic() == 2.5
@@ -0,0 +1,239 @@
+"""module test_edge_trace"""
+
+import io
+import logging
+import sys
+from unittest.mock import patch, Mock
+import pytest
+from reboot_button.clock import VirtualClock
+from reboot_button.edge_trace import (
+    DEBOUNCE_RPI_GPIO,
+    TraceWriter,
+    PressEvaluator,
+    capture_trace,
+    read_trace,
+    sweep_bouncetimes,
+)
+
+
+def write_trace(path, edges, initial_level=1, end_time=None):
+    """Writes the given (timestamp, level) edges to a trace file."""
+    with open(path, "wb") as trace_file:
+        writer = TraceWriter(trace_file, initial_level)
+        for timestamp, level in edges:
+            writer.write(timestamp, level)
+        writer.close(end_time if end_time is not None else edges[-1][0] + 1)
+
+
+def evaluate(evaluator, edges, end_time=None):
+    """Feeds the edges of a trace to the evaluator and returns its result."""
+    evaluator.reset(1)
+    for timestamp, level in edges:
+        evaluator.feed(timestamp, level)
+    evaluator.finish(end_time if end_time is not None else edges[-1][0] + 1)
+    return evaluator.result()
+
+
+def bouncy_press(start, length, bounces=3, bounce_gap=0.002):
+    """Returns the edges of a press that bounces when pressed and when released."""
+    edges = []
+    for i in range(bounces):
+        edges.append((start + 2 * i * bounce_gap, 0))
+        edges.append((start + (2 * i + 1) * bounce_gap, 1))
+    edges.append((start + 2 * bounces * bounce_gap, 0))
+    release = start + 2 * bounces * bounce_gap + length
+    for i in range(bounces):
+        edges.append((release + 2 * i * bounce_gap, 1))
+        edges.append((release + (2 * i + 1) * bounce_gap, 0))
+    edges.append((release + 2 * bounces * bounce_gap, 1))
+    return edges
+
+
+def test_trace_round_trip(tmp_path):
+    """
+    Test that edges written by TraceWriter are read back with microsecond resolution.
+    """
+    trace_path = tmp_path / "trace.rbet"
+    edges = [(0.000001, 0), (0.5, 1), (3600.25, 0), (3600.250003, 1)]
+    write_trace(trace_path, edges, end_time=7200.0)
+    result = list(read_trace(str(trace_path), chunk_size=3))
+    assert result == [(0.0, 1)] + edges + [(7200.0, None)]
+
+
+def test_trace_writer_buffer_is_bounded():
+    """
+    Test that TraceWriter writes its buffer once buffer_size bytes are collected.
+    """
+    trace_file = io.BytesIO()
+    writer = TraceWriter(trace_file, 1, buffer_size=16)
+    for i in range(1000):
+        writer.write(i * 0.01, i % 2)
+        assert len(writer._buffer) < 16  # pylint: disable=protected-access
+    assert writer.edge_count == 1000
+
+
+def test_read_trace_rejects_invalid_file(tmp_path):
+    """
+    Test that read_trace raises ValueError for a file that is not a trace.
+    """
+    trace_path = tmp_path / "trace.rbet"
+    trace_path.write_bytes(b"not a trace")
+    with pytest.raises(ValueError):
+        list(read_trace(str(trace_path)))
+
+
+def test_read_trace_rejects_truncated_file(tmp_path):
+    """
+    Test that read_trace raises ValueError for a trace ending inside a varint.
+    """
+    trace_path = tmp_path / "trace.rbet"
+    write_trace(trace_path, [(100.0, 0)])
+    trace_path.write_bytes(trace_path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        list(read_trace(str(trace_path)))
+
+
+def test_press_evaluator_counts_bounces_as_false_triggers():
+    """
+    Test that a bouncetime shorter than the bouncing leads to false triggers.
+    """
+    result = evaluate(PressEvaluator(1), bouncy_press(1.0, 0.2, bounce_gap=0.005))
+    assert result["presses"] == 1
+    assert result["missed_presses"] == 0
+    assert result["triggers"] == 7
+    assert result["false_triggers"] == 6
+
+
+def test_press_evaluator_counts_missed_presses():
+    """
+    Test that with the RPi.GPIO rule a press within bouncetime of the previous trigger is missed.
+    """
+    edges = bouncy_press(1.0, 0.1) + bouncy_press(1.3, 0.1)
+    result = evaluate(PressEvaluator(500, debounce=DEBOUNCE_RPI_GPIO), edges)
+    assert result["presses"] == 2
+    assert result["triggers"] == 1
+    assert result["false_triggers"] == 0
+    assert result["missed_presses"] == 1
+    assert result["missed_press_rate"] == 0.5
+
+
+def test_press_evaluator_counts_glitches_as_false_triggers():
+    """
+    Test that with the RPi.GPIO rule short low glitches are false triggers.
+    """
+    edges = [(1.0, 0), (1.001, 1), (5.0, 0), (5.002, 1)]
+    result = evaluate(PressEvaluator(50, debounce=DEBOUNCE_RPI_GPIO), edges)
+    assert result["presses"] == 0
+    assert result["false_triggers"] == 2
+    assert result["false_trigger_rate"] == 1.0
+
+
+def test_press_evaluator_lgpio_ignores_bounce_train_shorter_than_bouncetime():
+    """
+    Test that a bounce train shorter than bouncetime triggers only with the RPi.GPIO rule.
+    """
+    edges = [(1.0, 0), (1.002, 1), (1.004, 0), (1.006, 1), (1.008, 0), (1.010, 1)]
+    lgpio_result = evaluate(PressEvaluator(50), edges)
+    rpi_gpio_result = evaluate(PressEvaluator(50, debounce=DEBOUNCE_RPI_GPIO), edges)
+    assert lgpio_result["triggers"] == 0
+    assert lgpio_result["false_triggers"] == 0
+    assert rpi_gpio_result["triggers"] == 1
+    assert rpi_gpio_result["false_triggers"] == 1
+
+
+def test_press_evaluator_lgpio_misses_press_shorter_than_bouncetime():
+    """
+    Test that with the lgpio rule a press shorter than bouncetime is missed.
+    """
+    edges = bouncy_press(1.0, 0.1)
+    lgpio_result = evaluate(PressEvaluator(200), edges)
+    rpi_gpio_result = evaluate(PressEvaluator(200, debounce=DEBOUNCE_RPI_GPIO), edges)
+    assert lgpio_result["presses"] == 1
+    assert lgpio_result["missed_presses"] == 1
+    assert rpi_gpio_result["missed_presses"] == 0
+    assert rpi_gpio_result["false_triggers"] == 0
+
+
+def test_press_evaluator_rejects_unknown_debounce():
+    """
+    Test that PressEvaluator raises ValueError for an unknown debounce rule.
+    """
+    with pytest.raises(ValueError):
+        PressEvaluator(50, debounce="unknown")
+
+
+def test_press_evaluator_counts_press_held_at_end_of_capture():
+    """
+    Test that a press still held when the capture ends is counted as a press.
+    """
+    result = evaluate(PressEvaluator(50), [(1.0, 0)], end_time=3.0)
+    assert result["presses"] == 1
+    assert result["false_triggers"] == 0
+    assert result["missed_presses"] == 0
+
+
+def test_sweep_uses_end_of_capture(tmp_path):
+    """
+    Test that sweep_bouncetimes closes a held press at the recorded end of the capture.
+    """
+    trace_path = tmp_path / "trace.rbet"
+    write_trace(trace_path, [(1.0, 0)], end_time=3.0)
+    result = sweep_bouncetimes([str(trace_path)], [50])[0]
+    assert result["presses"] == 1
+    assert result["false_trigger_rate"] == 0.0
+
+
+def test_sweep_bouncetimes(tmp_path):
+    """
+    Test that sweep_bouncetimes evaluates all bouncetimes over all traces.
+    """
+    first_trace = tmp_path / "first.rbet"
+    second_trace = tmp_path / "second.rbet"
+    write_trace(first_trace, bouncy_press(1.0, 0.2) + bouncy_press(10.0, 0.2))
+    write_trace(second_trace, bouncy_press(2.0, 0.2) + [(20.0, 0), (20.001, 1)])
+    trace_paths = [str(first_trace), str(second_trace)]
+    results = sweep_bouncetimes(trace_paths, [1, 50, 500])
+    assert [result["bouncetime_ms"] for result in results] == [1, 50, 500]
+    assert [result["presses"] for result in results] == [3, 3, 3]
+    assert results[0]["false_triggers"] > 0
+    assert results[1]["false_triggers"] == 0
+    assert results[1]["missed_presses"] == 0
+    # The presses last 0.2 s, so the level is never stable for 500 ms.
+    assert results[2]["missed_presses"] == 3
+
+    results = sweep_bouncetimes(trace_paths, [1, 50, 500], debounce=DEBOUNCE_RPI_GPIO)
+    assert [result["missed_presses"] for result in results] == [0, 0, 0]
+    # 50 ms still triggers on the bouncing release of every press, plus the glitch.
+    assert results[1]["false_triggers"] == 4
+    assert results[2]["false_triggers"] == 1
+
+
+@patch.dict('sys.modules', {'lgpio': Mock()})
+def test_capture_trace(tmp_path):
+    """
+    Test that capture_trace stores the levels and timestamps passed by lgpio alerts.
+    """
+    lgpio = sys.modules['lgpio']
+    lgpio.error = RuntimeError
+    lgpio.gpio_read.return_value = 1
+    lgpio.timestamp.side_effect = [5_000_000_000, 3605_000_000_000]
+    callbacks = []
+    lgpio.callback.side_effect = \
+        lambda handle, pin, edge, func: callbacks.append(func) or Mock()
+    clock = VirtualClock()
+    # Bouncing edges reported late and with repeated levels are stored as reported.
+    clock.call_at(10.1, lambda: callbacks[0](0, 17, 0, 15_000_000_000))
+    clock.call_at(10.1, lambda: callbacks[0](0, 17, 0, 15_000_100_000))
+    clock.call_at(10.3, lambda: callbacks[0](0, 17, 2, 15_100_000_000))
+    clock.call_at(10.3, lambda: callbacks[0](0, 17, 1, 15_200_000_000))
+    trace_path = tmp_path / "trace.rbet"
+    edge_count = capture_trace(logging.getLogger(), 17, str(trace_path), 3600, clock=clock)
+    assert edge_count == 3
+    assert clock.monotonic() == pytest.approx(3600.1)
+    assert list(read_trace(str(trace_path))) == [
+        (0.0, 1), (10.0, 0), (10.0001, 0), (10.2, 1), (3600.0, None)
+    ]
+    lgpio.gpio_claim_alert.assert_called_once_with(
+        lgpio.gpiochip_open.return_value, 17, lgpio.BOTH_EDGES, lgpio.SET_PULL_UP
+    )
+    lgpio.gpiochip_close.assert_called_once_with(lgpio.gpiochip_open.return_value)
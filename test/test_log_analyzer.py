@@ -0,0 +1,261 @@
+"""module test_log_analyzer"""
+
+import gzip
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+from reboot_button.log_analyzer import (
+    analyze_log,
+    find_log_segments,
+    iter_segment_lines,
+    main,
+    seek_since,
+)
+
+
+START = datetime(2025, 3, 18, 12, 0, 0)
+
+
+def log_line(seconds, level, message):
+    """Returns a log line in the format of setup_file_logger."""
+    timestamp = (START + timedelta(seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S,%f")[:-3]
+    return f"{timestamp} - {level} - {message}\n"
+
+
+def startup_lines(seconds):
+    """Returns the lines logged when the application starts the button monitoring."""
+    return [
+        log_line(seconds, "INFO", "File logger for log file '/x.log' initialized successfully."),
+        log_line(seconds, "INFO", "Entering button monitoring mode on GPIO pin 21."),
+        log_line(seconds + 0.1, "INFO", "GPIO Version is '0.2', pin is '21'"),
+        log_line(seconds + 0.6, "INFO", "Button monitoring started. Waiting for events..."),
+    ]
+
+
+def failed_press_lines(seconds):
+    """Returns the lines logged for a press when sudo requires a password."""
+    return [
+        log_line(seconds, "INFO", "Button pressed on GPIO '21'. Attempting to reboot."),
+        log_line(seconds, "INFO", "Rebooting system..."),
+        log_line(seconds, "ERROR", "Command not found: sudo"),
+        log_line(seconds, "ERROR", "Maybe a password is required for sudo."),
+    ]
+
+
+def set_mtime(path, seconds):
+    """Sets the modification time of a file to START plus seconds."""
+    timestamp = (START + timedelta(seconds=seconds)).timestamp()
+    os.utime(path, (timestamp, timestamp))
+
+
+@pytest.fixture(name="rotated_log")
+def create_rotated_log(tmp_path):
+    """
+    Fixture to create a log file with a gzip compressed and a plain rotated segment.
+    """
+    log_file_path = tmp_path / "reboot_button.log"
+    oldest = tmp_path / "reboot_button.log.2.gz"
+    with gzip.open(oldest, "wt", encoding="utf-8") as oldest_file:
+        oldest_file.writelines(startup_lines(0) + failed_press_lines(100))
+    set_mtime(oldest, 100)
+    older = tmp_path / "reboot_button.log.1"
+    older.write_text("".join(startup_lines(1000) + failed_press_lines(1100)), encoding="utf-8")
+    set_mtime(older, 1100)
+    lines = []
+    for i in range(6):
+        lines += startup_lines(2000 + 5 * i)
+    lines += failed_press_lines(2100) + ["Traceback (most recent call last):\n"]
+    log_file_path.write_text("".join(lines), encoding="utf-8")
+    set_mtime(log_file_path, 2100)
+    return log_file_path
+
+
+def test_find_log_segments_orders_oldest_first(rotated_log):
+    """
+    Test that find_log_segments returns the rotated segments by age and the log file last.
+    """
+    segments = find_log_segments(str(rotated_log))
+    assert [os.path.basename(path) for path in segments] == [
+        "reboot_button.log.2.gz", "reboot_button.log.1", "reboot_button.log"
+    ]
+
+
+def test_find_log_segments_orders_by_rotation_suffix(tmp_path):
+    """
+    Test that find_log_segments orders by rotation suffix when the mtimes were reset.
+    """
+    log_file_path = tmp_path / "reboot_button.log"
+    for name in ("reboot_button.log", "reboot_button.log.1", "reboot_button.log.2.gz",
+                 "reboot_button.log.10.gz"):
+        (tmp_path / name).write_bytes(b"")
+    set_mtime(tmp_path / "reboot_button.log.10.gz", 3000)
+    segments = find_log_segments(str(log_file_path))
+    assert [os.path.basename(path) for path in segments] == [
+        "reboot_button.log.10.gz", "reboot_button.log.2.gz", "reboot_button.log.1",
+        "reboot_button.log"
+    ]
+
+
+def test_analyze_log_ignores_mtimes_of_copied_logs(rotated_log):
+    """
+    Test that analyze_log gives the same summary after a copy reset the mtimes.
+    """
+    for path in rotated_log.parent.iterdir():
+        set_mtime(path, 0)
+    summary = analyze_log(str(rotated_log))
+    assert len(summary["restart_storms"]) == 1
+    assert summary["process_starts"] == 8
+    summary = analyze_log(str(rotated_log), since=START + timedelta(seconds=1050))
+    assert summary["segments"] == 2
+    assert summary["presses"] == 2
+
+
+def test_analyze_log_summarizes_all_segments(rotated_log):
+    """
+    Test that analyze_log counts the events of the current and the rotated segments.
+    """
+    summary = analyze_log(str(rotated_log))
+    assert summary["segments"] == 3
+    assert summary["unparsed_lines"] == 1
+    assert summary["presses"] == 3
+    assert summary["reboot_attempts"] == 3
+    assert summary["sudo_failures"] == 3
+    assert summary["errors"] == 6
+    assert summary["process_starts"] == 8
+    assert summary["setups"] == 8
+    assert summary["setup_min"] == pytest.approx(0.5)
+    assert summary["setup_max"] == pytest.approx(0.5)
+    assert summary["setup_mean"] == pytest.approx(0.5)
+
+
+def test_analyze_log_detects_restart_storms(rotated_log):
+    """
+    Test that six setups within half a minute are reported as one restart storm.
+    """
+    summary = analyze_log(str(rotated_log))
+    assert len(summary["restart_storms"]) == 1
+    storm = summary["restart_storms"][0]
+    assert storm["restarts"] == 6
+    assert storm["start"] == START + timedelta(seconds=2000.1)
+    assert storm["end"] == START + timedelta(seconds=2025.1)
+    assert not analyze_log(str(rotated_log), storm_restarts=7)["restart_storms"]
+
+
+def test_analyze_log_ends_restart_storm_when_setups_become_sparse(tmp_path):
+    """
+    Test that a restart storm ends once fewer than storm_restarts setups are in the window.
+    """
+    log_file_path = tmp_path / "reboot_button.log"
+    lines = []
+    for seconds in list(range(5)) + [4 + 59 * i for i in range(1, 100)]:
+        lines += startup_lines(seconds)
+    log_file_path.write_text("".join(lines), encoding="utf-8")
+    storms = analyze_log(str(log_file_path))["restart_storms"]
+    assert len(storms) == 1
+    assert storms[0]["restarts"] == 5
+    assert storms[0]["start"] == START + timedelta(seconds=0.1)
+    assert storms[0]["end"] == START + timedelta(seconds=4.1)
+
+
+def test_analyze_log_since_skips_old_lines_and_segments(rotated_log):
+    """
+    Test that analyze_log with since skips old segments and lines.
+    """
+    summary = analyze_log(str(rotated_log), since=START + timedelta(seconds=1050))
+    assert summary["segments"] == 2
+    assert summary["presses"] == 2
+    assert summary["process_starts"] == 6
+    summary = analyze_log(str(rotated_log), since=START + timedelta(seconds=3000))
+    assert summary["segments"] == 0
+    assert summary["lines"] == 0
+
+
+def test_analyze_log_since_counts_unparsed_lines_alike_in_all_segments(tmp_path):
+    """
+    Test that with since unparsed lines are counted the same in compressed and plain segments.
+    """
+    log_file_path = tmp_path / "reboot_button.log"
+    lines = ["unparsed\n", log_line(0, "INFO", "old"), "unparsed\n", log_line(600, "INFO", "new"),
+             "unparsed\n"]
+    with gzip.open(tmp_path / "reboot_button.log.1.gz", "wt", encoding="utf-8") as rotated_file:
+        rotated_file.writelines(lines)
+    log_file_path.write_text("".join(lines), encoding="utf-8")
+    summary = analyze_log(str(log_file_path), since=START + timedelta(minutes=5))
+    assert summary["segments"] == 2
+    assert summary["lines"] == 2
+    assert summary["unparsed_lines"] == 2
+    summary = analyze_log(str(log_file_path), since=START + timedelta(minutes=20))
+    assert summary["segments"] == 0
+    assert summary["unparsed_lines"] == 0
+
+
+def test_analyze_log_since_accepts_timezone_aware_time(rotated_log):
+    """
+    Test that a timezone-aware since is compared as local time.
+    """
+    since = (START + timedelta(seconds=1050)).astimezone().astimezone(timezone.utc)
+    summary = analyze_log(str(rotated_log), since=since)
+    assert summary["presses"] == 2
+
+
+def test_seek_since_finds_first_line_at_or_after_since():
+    """
+    Test that seek_since returns the offset of the first line not older than since.
+    """
+    lines = [log_line(seconds, "INFO", "message").encode() for seconds in range(0, 100, 10)]
+    data = b"".join(lines)
+    for index, seconds in enumerate(range(0, 100, 10)):
+        since = log_line(seconds, "INFO", "")[:23].encode()
+        assert seek_since(data, since) == len(b"".join(lines[:index]))
+        since = log_line(seconds - 5, "INFO", "")[:23].encode()
+        assert seek_since(data, since) == len(b"".join(lines[:index]))
+    assert seek_since(data, log_line(200, "INFO", "")[:23].encode()) == len(data)
+
+
+def test_analyze_log_since_handles_backwards_clock_jump(tmp_path):
+    """
+    Test that lines at or after since before a backwards clock jump are not skipped.
+    """
+    log_file_path = tmp_path / "reboot_button.log"
+    press = "Button pressed on GPIO '21'. Attempting to reboot."
+    lines = [log_line(seconds, "INFO", press) for seconds in (0, 600)]
+    lines.append(log_line(-(START - datetime(2025, 1, 1)).total_seconds(), "INFO", press))
+    lines += [log_line(seconds, "INFO", press) for seconds in (3600, 3900)]
+    log_file_path.write_text("".join(lines), encoding="utf-8")
+    summary = analyze_log(str(log_file_path), since=START + timedelta(minutes=5))
+    assert summary["presses"] == 3
+
+
+def test_analyze_log_since_handles_clock_jump_at_end_of_segment(tmp_path):
+    """
+    Test that a segment whose last line jumped back before since is still read.
+    """
+    log_file_path = tmp_path / "reboot_button.log"
+    press = "Button pressed on GPIO '21'. Attempting to reboot."
+    lines = [log_line(seconds, "INFO", press) for seconds in (0, 600, -3600)]
+    log_file_path.write_text("".join(lines), encoding="utf-8")
+    summary = analyze_log(str(log_file_path), since=START + timedelta(minutes=5))
+    assert summary["presses"] == 1
+    assert summary["segments"] == 1
+
+
+def test_iter_segment_lines_handles_empty_file(tmp_path):
+    """
+    Test that iter_segment_lines yields nothing for an empty log file.
+    """
+    log_file_path = tmp_path / "reboot_button.log"
+    log_file_path.write_bytes(b"")
+    assert not list(iter_segment_lines(str(log_file_path), b"2025-03-18 12:00:00,000"))
+
+
+def test_main_prints_summary(rotated_log, capsys):
+    """
+    Test that main prints the summary of the log file.
+    """
+    main([str(rotated_log), "--since", "2025-03-18 12:16"])
+    output = capsys.readouterr().out
+    assert "presses: 2\n" in output
+    assert "restart_storms: 1\n" in output
+    since = (START + timedelta(seconds=1050)).astimezone().isoformat()
+    main([str(rotated_log), "--since", since])
+    assert "presses: 2\n" in capsys.readouterr().out